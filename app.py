@@ -6,21 +6,31 @@ This application generates investment property analysis reports
 and emails them as PDFs to users.
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, make_response
+from flask import Flask, Response, render_template, request, send_file
 from flask_cors import CORS
 import os
 from dotenv import load_dotenv
 import smtplib
 import urllib.request
 import json
+import orjson
+import functools
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 
 # Load environment variables from .env file
 load_dotenv()
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.application import MIMEApplication
+from email import policy
 from datetime import datetime
 import io
+from reportlab import rl_config
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -33,6 +43,11 @@ from reportlab.pdfbase.ttfonts import TTFont
 app = Flask(__name__)
 CORS(app)
 
+# Turn off attribute checking for reportlab.graphics shapes. Reports are
+# platypus-only today, so this has no effect on their output; it only
+# avoids the overhead if charts or drawings are added later.
+rl_config.shapeChecking = 0
+
 # Brand colors
 NAVY = HexColor('#1a3e5c')
 CYAN = HexColor('#00a8e1')
@@ -43,6 +58,236 @@ SUCCESS = HexColor('#28a745')
 WARNING = HexColor('#ffc107')
 DANGER = HexColor('#dc3545')
 
+# Status and verdict label colors - anything not listed is shown in DANGER
+STATUS_COLORS = {
+    'GOOD': SUCCESS,
+    'STRONG': SUCCESS,
+    'PASS': SUCCESS,
+    'YES': SUCCESS,
+    'AVERAGE': WARNING,
+    'MARGINAL': WARNING,
+    'REVIEW': WARNING,
+}
+
+VERDICT_COLORS = {
+    'STRONG BUY': SUCCESS,
+    'CONSIDER': CYAN,
+    'REVIEW': WARNING,
+}
+
+# Preload the standard font metrics the report uses, so they are parsed once
+# per process (and inherited by forked PDF workers) rather than on first use
+for _font_name in ('Helvetica', 'Helvetica-Bold'):
+    pdfmetrics.getFont(_font_name)
+
+# PDF styles - built once at import, shared by every report
+_STYLES = getSampleStyleSheet()
+
+TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=24,
+    textColor=NAVY,
+    spaceAfter=6,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+SUBTITLE_STYLE = ParagraphStyle(
+    'CustomSubtitle',
+    parent=_STYLES['Normal'],
+    fontSize=12,
+    textColor=DARK_GRAY,
+    spaceAfter=20,
+    alignment=TA_CENTER
+)
+
+SECTION_STYLE = ParagraphStyle(
+    'SectionHeader',
+    parent=_STYLES['Heading2'],
+    fontSize=14,
+    textColor=NAVY,
+    spaceBefore=20,
+    spaceAfter=10,
+    fontName='Helvetica-Bold'
+)
+
+NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_STYLES['Normal'],
+    fontSize=10,
+    textColor=DARK_GRAY
+)
+
+REPORT_TITLE_STYLE = ParagraphStyle(
+    'ReportTitle',
+    parent=_STYLES['Heading1'],
+    fontSize=20,
+    textColor=CYAN,
+    spaceAfter=10,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+PREPARED_FOR_STYLE = ParagraphStyle('PreparedFor', parent=NORMAL_STYLE, alignment=TA_CENTER, spaceAfter=20)
+
+FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_STYLES['Normal'],
+    fontSize=9,
+    textColor=DARK_GRAY,
+    alignment=TA_CENTER,
+    spaceAfter=5
+)
+
+FOOTER_LINK_STYLE = ParagraphStyle('FooterLink', parent=FOOTER_STYLE, textColor=CYAN)
+
+DISCLAIMER_STYLE = ParagraphStyle('Disclaimer', parent=FOOTER_STYLE, fontSize=7, textColor=HexColor('#888888'))
+
+# Table styles - the static portion of each report table
+PROPERTY_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
+    ('TEXTCOLOR', (1, 0), (1, -1), DARK_GRAY),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+FINANCIAL_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTNAME', (3, 0), (3, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
+    ('TEXTCOLOR', (2, 0), (2, -1), NAVY),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+    ('TOPPADDING', (0, 0), (-1, -1), 5),
+    ('LINEBELOW', (0, -1), (-1, -1), 1, LIGHT_GRAY),
+])
+
+CASHFLOW_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 12),
+    ('TEXTCOLOR', (0, 0), (0, -1), WHITE),
+    ('TEXTCOLOR', (1, 0), (1, -1), WHITE),
+    ('BACKGROUND', (0, 0), (-1, -1), NAVY),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+    ('TOPPADDING', (0, 0), (-1, -1), 12),
+])
+
+METRICS_TABLE_STYLE_BASE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('LINEBELOW', (0, 0), (-1, -2), 0.5, LIGHT_GRAY),
+    ('GRID', (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
+])
+
+RULES_TABLE_STYLE_BASE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ('BACKGROUND', (0, 0), (-1, 0), NAVY),
+    ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
+    ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
+])
+
+VERDICT_TABLE_STYLE_BASE = TableStyle([
+    ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (0, 0), 14),
+    ('FONTSIZE', (1, 0), (1, 0), 18),
+    ('TEXTCOLOR', (0, 0), (0, 0), WHITE),
+    ('BACKGROUND', (0, 0), (-1, -1), NAVY),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+    ('TOPPADDING', (0, 0), (-1, -1), 15),
+])
+
+FINANCING_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+])
+
+# Static report header and footer text. Only the text is shared: the
+# flowables are built per report, because ReportLab records layout state on
+# them (e.g. _postponed) that would leak into the next build.
+HEADER_TITLE = "THE EDMUND BOGEN TEAM"
+HEADER_SUBTITLE = "AT DOUGLAS ELLIMAN REAL ESTATE"
+REPORT_TITLE = "INVESTMENT PROPERTY ANALYSIS"
+
+FOOTER_SEP = "─" * 80
+FOOTER_COMPLIMENTS = "Compliments of The Edmund Bogen Team at Douglas Elliman Real Estate"
+FOOTER_TAGLINE = "From Palm Beach to Miami, we can help you find your next investment property."
+FOOTER_LINK = "www.bogenhomes.com"
+DISCLAIMER_TEXT = (
+    "DISCLAIMER: This analysis is for informational purposes only. Actual results may vary. "
+    "Please consult with qualified professionals before making investment decisions."
+)
+
+# Values used for any field missing from the report request
+_REPORT_DEFAULTS = {
+    'userName': 'N/A',
+    'propertyAddress': 'N/A',
+    'propertyCity': '',
+    'propertyState': 'FL',
+    'propertyZip': '',
+    'propertyType': 'N/A',
+    'numUnits': 1,
+    'bedrooms': 'N/A',
+    'bathrooms': 'N/A',
+    'sqft': 0,
+    'yearBuilt': 'N/A',
+    'lotSize': 0,
+    'purchasePrice': 0,
+    'downPayment': 0,
+    'closingCosts': 0,
+    'rehabCosts': 0,
+    'loanAmount': 0,
+    'totalCashNeeded': 0,
+    'grossRentMonthly': 0,
+    'vacancyRate': 0,
+    'otherIncomeMonthly': 0,
+    'effectiveIncomeMonthly': 0,
+    'totalExpensesMonthly': 0,
+    'noiMonthly': 0,
+    'monthlyPayment': 0,
+    'monthlyCashFlow': 0,
+    'annualCashFlow': 0,
+    'capRate': 0,
+    'cashOnCash': 0,
+    'dscr': 0,
+    'grm': 0,
+    'onePercentRule': 0,
+    'rule1Pass': False,
+    'rule2Pass': False,
+    'rule50Pass': False,
+    'rule70Pass': False,
+    'cashFlowPositivePass': False,
+    'verdict': 'REVIEW',
+    'interestRate': 0,
+    'loanTermYears': 30,
+    'downPaymentPercent': 0,
+    'annualDebtService': 0,
+}
+
 # Email configuration - Update these with your SMTP settings
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')
 EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
@@ -53,6 +298,89 @@ EMAIL_FROM = os.environ.get('EMAIL_FROM', 'Edmund Bogen Team <info@bogenhomes.co
 # Google Sheet webhook URL
 GOOGLE_SHEET_URL = 'https://script.google.com/macros/s/AKfycbwwAdkoAtsjAq48UXDiRb9kkEVnc_QFfSqTac5f5qnz0v5JcaDKJsW-4TUAYi8MJVH4bQ/exec'
 
+# Characters rewritten or dropped when turning an address into a filename
+_ADDR_TABLE = str.maketrans({' ': '_', ',': None, '.': None})
+
+# PDF worker pool - keeps ReportLab layout off the request thread
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', os.cpu_count() or 1))
+PDF_TIMEOUT = int(os.environ.get('PDF_TIMEOUT', 30))
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
+
+# Outgoing email queue, drained by a background sender thread that
+# reuses one SMTP connection (see _SMTPPool)
+_email_queue = queue.Queue()
+_email_worker = None
+_email_worker_lock = threading.Lock()
+
+
+def get_pdf_executor():
+    """Return the PDF worker pool, creating it on first use.
+
+    The pool is created lazily so that each server process gets its own
+    workers rather than inheriting one from a pre-forking parent. Returns
+    None where the platform cannot run a process pool (e.g. serverless
+    runtimes without shared memory).
+    """
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            try:
+                _pdf_executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+            except (OSError, NotImplementedError) as e:
+                print(f"PDF worker pool unavailable, rendering inline: {str(e)}")
+                _pdf_executor = False
+        return _pdf_executor or None
+
+
+def generate_pdf_bytes(data, day_ordinal=None):
+    """Generate the PDF report and return its raw bytes."""
+    return generate_pdf(data, day_ordinal).getvalue()
+
+
+def reset_pdf_executor(executor):
+    """Discard a broken worker pool so the next call creates a fresh one."""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is executor:
+            _pdf_executor = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def render_pdf(data, day_ordinal=None):
+    """Generate the PDF report bytes in the worker pool and wait for the result.
+
+    If a worker process has died the pool is unusable, so it is replaced
+    and the render retried once.
+    """
+    for attempt in range(2):
+        executor = get_pdf_executor()
+        if executor is None:
+            return generate_pdf_bytes(data, day_ordinal)
+        try:
+            future = executor.submit(generate_pdf_bytes, data, day_ordinal)
+            return future.result(timeout=PDF_TIMEOUT)
+        except BrokenProcessPool:
+            print("PDF worker pool broken, restarting it")
+            reset_pdf_executor(executor)
+            if attempt:
+                raise
+        except FuturesTimeoutError:
+            # Drop the render if it hasn't started so it doesn't tie up a worker
+            future.cancel()
+            raise TimeoutError(f"PDF generation timed out after {PDF_TIMEOUT} seconds") from None
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_report_pdf(payload, day_ordinal):
+    """Render the report for a canonical JSON payload, memoized per day.
+
+    The report is stamped with the date for day_ordinal, so the day is part
+    of the key and the rendered date always matches it.
+    Clear with _cached_report_pdf.cache_clear() if the branding changes.
+    """
+    return render_pdf(orjson.loads(payload), day_ordinal)
+
 
 def send_to_google_sheet(data):
     """Send lead data to Google Sheet."""
@@ -95,37 +423,48 @@ def index():
 def generate_report():
     """Generate PDF report and return it for download."""
     try:
-        data = request.get_json()
+        data = orjson.loads(request.get_data(cache=False))
 
         # Send lead data to Google Sheet (non-blocking)
         send_to_google_sheet(data)
 
-        # Generate PDF
-        pdf_buffer = generate_pdf(data)
+        # Generate PDF (identical inputs on the same day reuse the cached report).
+        # Only the fields the report prints go into the key, so contact details
+        # like userEmail don't split the cache or linger in it.
+        report_data = {k: data[k] for k in _REPORT_DEFAULTS if k in data}
+        payload = orjson.dumps(report_data, option=orjson.OPT_SORT_KEYS)
+        pdf_bytes = _cached_report_pdf(payload, datetime.now().toordinal())
 
         # Create filename from property address
-        property_address = data.get('propertyAddress', 'Investment_Property')
-        safe_address = property_address.replace(' ', '_').replace(',', '').replace('.', '')[:30]
-        filename = f'Investment_Analysis_{safe_address}.pdf'
-
-        # Return PDF as downloadable file
-        response = make_response(pdf_buffer.getvalue())
-        response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-        return response
+        filename = _safe_filename(data.get('propertyAddress', 'Investment_Property'))
+
+        # Stream PDF back as downloadable file
+        return send_file(
+            io.BytesIO(pdf_bytes),
+            mimetype='application/pdf',
+            as_attachment=True,
+            download_name=filename,
+            max_age=0
+        )
 
     except Exception as e:
         print(f"Error generating report: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return Response(
+            orjson.dumps({'success': False, 'error': str(e)}),
+            status=500,
+            mimetype='application/json'
+        )
 
 
+@functools.lru_cache(maxsize=256)
 def format_currency(amount):
-    """Format a number as currency."""
-    if amount is None:
+    """Format a number as whole-dollar currency."""
+    if not amount:
         return '$0'
-    return f"${amount:,.0f}"
+    return f"${round(amount):,}"
 
 
+@functools.lru_cache(maxsize=256)
 def format_percent(value):
     """Format a decimal as percentage."""
     if value is None:
@@ -133,6 +472,11 @@ def format_percent(value):
     return f"{value * 100:.2f}%"
 
 
+def _safe_filename(address):
+    """Build the report filename for a property address."""
+    return f'Investment_Analysis_{address.translate(_ADDR_TABLE)[:30]}.pdf'
+
+
 def get_status_color(value, good_threshold, warn_threshold=None, higher_is_better=True):
     """Determine status color based on value."""
     if higher_is_better:
@@ -149,8 +493,48 @@ def get_status_color(value, good_threshold, warn_threshold=None, higher_is_bette
         return DANGER
 
 
-def generate_pdf(data):
-    """Generate the PDF report."""
+@functools.lru_cache(maxsize=1)
+def _today_str(day_ordinal):
+    """Format a day (as a date ordinal) for the report, e.g. 'January 05, 2025'."""
+    return datetime.fromordinal(day_ordinal).strftime('%B %d, %Y')
+
+
+def derive_metrics(d):
+    """Compute the derived figures and status labels shown in the report.
+
+    Expects the report data already merged with _REPORT_DEFAULTS.
+    """
+    gross_rent = d['grossRentMonthly']
+    down_payment_pct = d['downPaymentPercent']
+    cap_rate = d['capRate']
+    coc = d['cashOnCash']
+    dscr = d['dscr']
+    grm = d['grm']
+    one_pct = d['onePercentRule']
+
+    return {
+        'vacancy_loss': gross_rent * d['vacancyRate'] * -1,
+        'opex_neg': d['totalExpensesMonthly'] * -1,
+        'mortgage_neg': d['monthlyPayment'] * -1,
+        'down_payment_pct': down_payment_pct * 100,
+        'ltv': (1 - down_payment_pct) * 100,
+        'cap_rate_status': 'GOOD' if cap_rate >= 0.08 else ('AVERAGE' if cap_rate >= 0.06 else 'LOW'),
+        'coc_status': 'GOOD' if coc >= 0.10 else ('AVERAGE' if coc >= 0.06 else 'LOW'),
+        'dscr_status': 'STRONG' if dscr >= 1.25 else ('MARGINAL' if dscr >= 1.0 else 'WEAK'),
+        'grm_status': 'GOOD' if grm <= 12 else 'HIGH',
+        'one_pct_status': 'PASS' if one_pct >= 0.01 else 'FAIL',
+        'rule1_result': 'PASS' if d['rule1Pass'] else 'FAIL',
+        'rule2_result': 'PASS' if d['rule2Pass'] else 'FAIL',
+        'rule50_result': 'PASS' if d['rule50Pass'] else 'REVIEW',
+        'rule70_result': 'PASS' if d['rule70Pass'] else 'FAIL',
+        'cash_flow_result': 'YES' if d['cashFlowPositivePass'] else 'NO',
+    }
+
+
+def generate_pdf(data, day_ordinal=None):
+    """Generate the PDF report, dated day_ordinal (defaults to today)."""
+    d = _REPORT_DEFAULTS | data
+    metrics = derive_metrics(d)
     buffer = io.BytesIO()
 
     doc = SimpleDocTemplate(
@@ -162,135 +546,64 @@ def generate_pdf(data):
         bottomMargin=0.75*inch
     )
 
-    # Define styles
-    styles = getSampleStyleSheet()
-
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=NAVY,
-        spaceAfter=6,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=12,
-        textColor=DARK_GRAY,
-        spaceAfter=20,
-        alignment=TA_CENTER
-    )
-
-    section_style = ParagraphStyle(
-        'SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=NAVY,
-        spaceBefore=20,
-        spaceAfter=10,
-        fontName='Helvetica-Bold'
-    )
-
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=DARK_GRAY
-    )
-
     # Build content
     story = []
 
     # Header
-    story.append(Paragraph("THE EDMUND BOGEN TEAM", title_style))
-    story.append(Paragraph("AT DOUGLAS ELLIMAN REAL ESTATE", subtitle_style))
+    story.append(Paragraph(HEADER_TITLE, TITLE_STYLE))
+    story.append(Paragraph(HEADER_SUBTITLE, SUBTITLE_STYLE))
     story.append(Spacer(1, 10))
 
     # Report Title
-    story.append(Paragraph("INVESTMENT PROPERTY ANALYSIS", ParagraphStyle(
-        'ReportTitle',
-        parent=styles['Heading1'],
-        fontSize=20,
-        textColor=CYAN,
-        spaceAfter=10,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )))
+    story.append(Paragraph(REPORT_TITLE, REPORT_TITLE_STYLE))
 
     # Date and prepared for
     story.append(Paragraph(
-        f"Prepared for: {data.get('userName', 'N/A')}<br/>Date: {datetime.now().strftime('%B %d, %Y')}",
-        ParagraphStyle('PreparedFor', parent=normal_style, alignment=TA_CENTER, spaceAfter=20)
+        f"Prepared for: {d['userName']}<br/>Date: {_today_str(day_ordinal or datetime.now().toordinal())}",
+        PREPARED_FOR_STYLE
     ))
 
     story.append(Spacer(1, 10))
 
     # Property Summary Section
-    story.append(Paragraph("PROPERTY SUMMARY", section_style))
+    story.append(Paragraph("PROPERTY SUMMARY", SECTION_STYLE))
 
-    address = f"{data.get('propertyAddress', 'N/A')}, {data.get('propertyCity', '')}, {data.get('propertyState', 'FL')} {data.get('propertyZip', '')}"
+    address = f"{d['propertyAddress']}, {d['propertyCity']}, {d['propertyState']} {d['propertyZip']}"
 
     property_data = [
         ['Address:', address],
-        ['Property Type:', data.get('propertyType', 'N/A')],
-        ['Units:', str(data.get('numUnits', 1))],
-        ['Bedrooms / Bathrooms:', f"{data.get('bedrooms', 'N/A')} / {data.get('bathrooms', 'N/A')}"],
-        ['Square Footage:', f"{data.get('sqft', 0):,} SF"],
-        ['Year Built:', str(data.get('yearBuilt', 'N/A'))],
-        ['Lot Size:', f"{data.get('lotSize', 0)} acres"],
+        ['Property Type:', d['propertyType']],
+        ['Units:', str(d['numUnits'])],
+        ['Bedrooms / Bathrooms:', f"{d['bedrooms']} / {d['bathrooms']}"],
+        ['Square Footage:', f"{d['sqft']:,} SF"],
+        ['Year Built:', str(d['yearBuilt'])],
+        ['Lot Size:', f"{d['lotSize']} acres"],
     ]
 
-    property_table = Table(property_data, colWidths=[2*inch, 4.5*inch])
-    property_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
-        ('TEXTCOLOR', (1, 0), (1, -1), DARK_GRAY),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    property_table = Table(property_data, colWidths=[2*inch, 4.5*inch], style=PROPERTY_TABLE_STYLE)
     story.append(property_table)
     story.append(Spacer(1, 15))
 
     # Financial Snapshot Section
-    story.append(Paragraph("FINANCIAL SNAPSHOT", section_style))
+    story.append(Paragraph("FINANCIAL SNAPSHOT", SECTION_STYLE))
 
     financial_data = [
-        ['Purchase Price:', format_currency(data.get('purchasePrice', 0)), 'Monthly Rent:', format_currency(data.get('grossRentMonthly', 0))],
-        ['Down Payment:', format_currency(data.get('downPayment', 0)), 'Vacancy Loss:', format_currency(data.get('grossRentMonthly', 0) * data.get('vacancyRate', 0) * -1)],
-        ['Closing Costs:', format_currency(data.get('closingCosts', 0)), 'Other Income:', format_currency(data.get('otherIncomeMonthly', 0))],
-        ['Rehab Costs:', format_currency(data.get('rehabCosts', 0)), 'Effective Income:', format_currency(data.get('effectiveIncomeMonthly', 0))],
-        ['Loan Amount:', format_currency(data.get('loanAmount', 0)), 'Operating Expenses:', format_currency(data.get('totalExpensesMonthly', 0) * -1)],
-        ['Total Cash Needed:', format_currency(data.get('totalCashNeeded', 0)), 'NOI (Monthly):', format_currency(data.get('noiMonthly', 0))],
-        ['', '', 'Mortgage Payment:', format_currency(data.get('monthlyPayment', 0) * -1)],
+        ['Purchase Price:', format_currency(d['purchasePrice']), 'Monthly Rent:', format_currency(d['grossRentMonthly'])],
+        ['Down Payment:', format_currency(d['downPayment']), 'Vacancy Loss:', format_currency(metrics['vacancy_loss'])],
+        ['Closing Costs:', format_currency(d['closingCosts']), 'Other Income:', format_currency(d['otherIncomeMonthly'])],
+        ['Rehab Costs:', format_currency(d['rehabCosts']), 'Effective Income:', format_currency(d['effectiveIncomeMonthly'])],
+        ['Loan Amount:', format_currency(d['loanAmount']), 'Operating Expenses:', format_currency(metrics['opex_neg'])],
+        ['Total Cash Needed:', format_currency(d['totalCashNeeded']), 'NOI (Monthly):', format_currency(d['noiMonthly'])],
+        ['', '', 'Mortgage Payment:', format_currency(metrics['mortgage_neg'])],
     ]
 
-    financial_table = Table(financial_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
-    financial_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (2, 0), (2, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-        ('FONTNAME', (3, 0), (3, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
-        ('TEXTCOLOR', (2, 0), (2, -1), NAVY),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ('TOPPADDING', (0, 0), (-1, -1), 5),
-        ('LINEBELOW', (0, -1), (-1, -1), 1, LIGHT_GRAY),
-    ]))
+    financial_table = Table(financial_data, colWidths=[1.5*inch, 1.5*inch, 1.5*inch, 1.5*inch], style=FINANCIAL_TABLE_STYLE)
     story.append(financial_table)
     story.append(Spacer(1, 10))
 
     # Monthly Cash Flow highlight
-    monthly_cf = data.get('monthlyCashFlow', 0)
-    annual_cf = data.get('annualCashFlow', 0)
+    monthly_cf = d['monthlyCashFlow']
+    annual_cf = d['annualCashFlow']
 
     cf_color = SUCCESS if monthly_cf > 0 else DANGER
 
@@ -299,177 +612,99 @@ def generate_pdf(data):
         ['ANNUAL CASH FLOW', format_currency(annual_cf)],
     ]
 
-    cashflow_table = Table(cashflow_data, colWidths=[3.25*inch, 3.25*inch])
-    cashflow_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 12),
-        ('TEXTCOLOR', (0, 0), (0, -1), WHITE),
-        ('TEXTCOLOR', (1, 0), (1, -1), WHITE),
-        ('BACKGROUND', (0, 0), (-1, -1), NAVY),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
-        ('TOPPADDING', (0, 0), (-1, -1), 12),
-    ]))
+    cashflow_table = Table(cashflow_data, colWidths=[3.25*inch, 3.25*inch], style=CASHFLOW_TABLE_STYLE)
     story.append(cashflow_table)
     story.append(Spacer(1, 20))
 
     # Key Metrics Section
-    story.append(Paragraph("KEY INVESTMENT METRICS", section_style))
+    story.append(Paragraph("KEY INVESTMENT METRICS", SECTION_STYLE))
 
-    cap_rate = data.get('capRate', 0)
-    coc = data.get('cashOnCash', 0)
-    dscr = data.get('dscr', 0)
-    grm = data.get('grm', 0)
-    one_pct = data.get('onePercentRule', 0)
+    cap_rate = d['capRate']
+    coc = d['cashOnCash']
+    dscr = d['dscr']
+    grm = d['grm']
+    one_pct = d['onePercentRule']
 
     metrics_data = [
         ['Metric', 'Value', 'Target', 'Status'],
-        ['Cap Rate', format_percent(cap_rate), '>= 8%', 'GOOD' if cap_rate >= 0.08 else ('AVERAGE' if cap_rate >= 0.06 else 'LOW')],
-        ['Cash-on-Cash Return', format_percent(coc), '>= 10%', 'GOOD' if coc >= 0.10 else ('AVERAGE' if coc >= 0.06 else 'LOW')],
-        ['Debt Service Coverage Ratio', f"{dscr:.2f}", '>= 1.25x', 'STRONG' if dscr >= 1.25 else ('MARGINAL' if dscr >= 1.0 else 'WEAK')],
-        ['Gross Rent Multiplier', f"{grm:.2f}", '<= 12', 'GOOD' if grm <= 12 else 'HIGH'],
-        ['1% Rule', format_percent(one_pct), '>= 1%', 'PASS' if one_pct >= 0.01 else 'FAIL'],
+        ['Cap Rate', format_percent(cap_rate), '>= 8%', metrics['cap_rate_status']],
+        ['Cash-on-Cash Return', format_percent(coc), '>= 10%', metrics['coc_status']],
+        ['Debt Service Coverage Ratio', f"{dscr:.2f}", '>= 1.25x', metrics['dscr_status']],
+        ['Gross Rent Multiplier', f"{grm:.2f}", '<= 12', metrics['grm_status']],
+        ['1% Rule', format_percent(one_pct), '>= 1%', metrics['one_pct_status']],
     ]
 
-    metrics_table = Table(metrics_data, colWidths=[2.5*inch, 1.25*inch, 1.25*inch, 1.5*inch])
-    metrics_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-        ('ALIGN', (1, 0), (-1, -1), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('LINEBELOW', (0, 0), (-1, -2), 0.5, LIGHT_GRAY),
-        ('GRID', (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-    ]))
-
     # Color code the status column
-    for i, row in enumerate(metrics_data[1:], start=1):
-        status = row[3]
-        if status in ['GOOD', 'STRONG', 'PASS']:
-            metrics_table.setStyle(TableStyle([('TEXTCOLOR', (3, i), (3, i), SUCCESS)]))
-        elif status in ['AVERAGE', 'MARGINAL']:
-            metrics_table.setStyle(TableStyle([('TEXTCOLOR', (3, i), (3, i), WARNING)]))
-        else:
-            metrics_table.setStyle(TableStyle([('TEXTCOLOR', (3, i), (3, i), DANGER)]))
+    status_cmds = [
+        ('TEXTCOLOR', (3, i), (3, i), STATUS_COLORS.get(row[3], DANGER))
+        for i, row in enumerate(metrics_data[1:], start=1)
+    ]
+
+    metrics_table = Table(metrics_data, colWidths=[2.5*inch, 1.25*inch, 1.25*inch, 1.5*inch],
+                          style=TableStyle(status_cmds, parent=METRICS_TABLE_STYLE_BASE))
 
     story.append(metrics_table)
     story.append(Spacer(1, 20))
 
     # Quick Rules Check
-    story.append(Paragraph("QUICK RULES CHECK", section_style))
+    story.append(Paragraph("QUICK RULES CHECK", SECTION_STYLE))
 
     rules_data = [
         ['Rule', 'Result', 'Description'],
-        ['1% Rule', 'PASS' if data.get('rule1Pass', False) else 'FAIL', 'Monthly rent should be >= 1% of purchase price'],
-        ['2% Rule', 'PASS' if data.get('rule2Pass', False) else 'FAIL', 'Monthly rent should be >= 2% of purchase price (strong cash flow)'],
-        ['50% Rule', 'PASS' if data.get('rule50Pass', False) else 'REVIEW', 'Operating expenses should be <= 50% of rent'],
-        ['70% Rule (Flip)', 'PASS' if data.get('rule70Pass', False) else 'FAIL', 'Purchase + rehab should be <= 70% of ARV'],
-        ['Cash Flow Positive', 'YES' if data.get('cashFlowPositivePass', False) else 'NO', 'Property generates positive cash flow after all expenses'],
+        ['1% Rule', metrics['rule1_result'], 'Monthly rent should be >= 1% of purchase price'],
+        ['2% Rule', metrics['rule2_result'], 'Monthly rent should be >= 2% of purchase price (strong cash flow)'],
+        ['50% Rule', metrics['rule50_result'], 'Operating expenses should be <= 50% of rent'],
+        ['70% Rule (Flip)', metrics['rule70_result'], 'Purchase + rehab should be <= 70% of ARV'],
+        ['Cash Flow Positive', metrics['cash_flow_result'], 'Property generates positive cash flow after all expenses'],
     ]
 
-    rules_table = Table(rules_data, colWidths=[1.5*inch, 1*inch, 4*inch])
-    rules_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('BACKGROUND', (0, 0), (-1, 0), NAVY),
-        ('TEXTCOLOR', (0, 0), (-1, 0), WHITE),
-        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('GRID', (0, 0), (-1, -1), 0.5, LIGHT_GRAY),
-    ]))
-
     # Color code results
+    result_cmds = []
     for i, row in enumerate(rules_data[1:], start=1):
-        result = row[1]
-        if result in ['PASS', 'YES']:
-            rules_table.setStyle(TableStyle([
-                ('TEXTCOLOR', (1, i), (1, i), SUCCESS),
-                ('FONTNAME', (1, i), (1, i), 'Helvetica-Bold'),
-            ]))
-        elif result == 'REVIEW':
-            rules_table.setStyle(TableStyle([
-                ('TEXTCOLOR', (1, i), (1, i), WARNING),
-                ('FONTNAME', (1, i), (1, i), 'Helvetica-Bold'),
-            ]))
-        else:
-            rules_table.setStyle(TableStyle([
-                ('TEXTCOLOR', (1, i), (1, i), DANGER),
-                ('FONTNAME', (1, i), (1, i), 'Helvetica-Bold'),
-            ]))
+        result_cmds.append(('TEXTCOLOR', (1, i), (1, i), STATUS_COLORS.get(row[1], DANGER)))
+        result_cmds.append(('FONTNAME', (1, i), (1, i), 'Helvetica-Bold'))
+
+    rules_table = Table(rules_data, colWidths=[1.5*inch, 1*inch, 4*inch],
+                        style=TableStyle(result_cmds, parent=RULES_TABLE_STYLE_BASE))
 
     story.append(rules_table)
     story.append(Spacer(1, 20))
 
     # Deal Verdict
-    verdict = data.get('verdict', 'REVIEW')
-    verdict_color = SUCCESS if verdict == 'STRONG BUY' else (CYAN if verdict == 'CONSIDER' else (WARNING if verdict == 'REVIEW' else DANGER))
+    verdict = d['verdict']
+    verdict_color = VERDICT_COLORS.get(verdict, DANGER)
 
     verdict_data = [['DEAL VERDICT', verdict]]
-    verdict_table = Table(verdict_data, colWidths=[3.25*inch, 3.25*inch])
-    verdict_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (0, 0), 14),
-        ('FONTSIZE', (1, 0), (1, 0), 18),
-        ('TEXTCOLOR', (0, 0), (0, 0), WHITE),
-        ('TEXTCOLOR', (1, 0), (1, 0), verdict_color),
-        ('BACKGROUND', (0, 0), (-1, -1), NAVY),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-        ('TOPPADDING', (0, 0), (-1, -1), 15),
-    ]))
+    verdict_table = Table(verdict_data, colWidths=[3.25*inch, 3.25*inch],
+                          style=TableStyle([('TEXTCOLOR', (1, 0), (1, 0), verdict_color)],
+                                           parent=VERDICT_TABLE_STYLE_BASE))
     story.append(verdict_table)
     story.append(Spacer(1, 30))
 
     # Financing Details
-    story.append(Paragraph("FINANCING DETAILS", section_style))
+    story.append(Paragraph("FINANCING DETAILS", SECTION_STYLE))
 
     financing_data = [
-        ['Interest Rate:', format_percent(data.get('interestRate', 0))],
-        ['Loan Term:', f"{data.get('loanTermYears', 30)} years"],
-        ['Down Payment:', f"{data.get('downPaymentPercent', 0) * 100:.0f}%"],
-        ['LTV Ratio:', f"{(1 - data.get('downPaymentPercent', 0)) * 100:.0f}%"],
-        ['Monthly P&I:', format_currency(data.get('monthlyPayment', 0))],
-        ['Annual Debt Service:', format_currency(data.get('annualDebtService', 0))],
+        ['Interest Rate:', format_percent(d['interestRate'])],
+        ['Loan Term:', f"{d['loanTermYears']} years"],
+        ['Down Payment:', f"{metrics['down_payment_pct']:.0f}%"],
+        ['LTV Ratio:', f"{metrics['ltv']:.0f}%"],
+        ['Monthly P&I:', format_currency(d['monthlyPayment'])],
+        ['Annual Debt Service:', format_currency(d['annualDebtService'])],
     ]
 
-    financing_table = Table(financing_data, colWidths=[2*inch, 2*inch])
-    financing_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('TEXTCOLOR', (0, 0), (0, -1), NAVY),
-        ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-        ('TOPPADDING', (0, 0), (-1, -1), 6),
-    ]))
+    financing_table = Table(financing_data, colWidths=[2*inch, 2*inch], style=FINANCING_TABLE_STYLE)
     story.append(financing_table)
     story.append(Spacer(1, 30))
 
     # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=DARK_GRAY,
-        alignment=TA_CENTER,
-        spaceAfter=5
-    )
-
-    story.append(Paragraph("─" * 80, footer_style))
+    story.append(Paragraph(FOOTER_SEP, FOOTER_STYLE))
     story.append(Spacer(1, 10))
-    story.append(Paragraph("Compliments of The Edmund Bogen Team at Douglas Elliman Real Estate", footer_style))
-    story.append(Paragraph("From Palm Beach to Miami, we can help you find your next investment property.", footer_style))
-    story.append(Paragraph("www.bogenhomes.com", ParagraphStyle('FooterLink', parent=footer_style, textColor=CYAN)))
+    story.append(Paragraph(FOOTER_COMPLIMENTS, FOOTER_STYLE))
+    story.append(Paragraph(FOOTER_TAGLINE, FOOTER_STYLE))
+    story.append(Paragraph(FOOTER_LINK, FOOTER_LINK_STYLE))
     story.append(Spacer(1, 10))
-    story.append(Paragraph(
-        "DISCLAIMER: This analysis is for informational purposes only. Actual results may vary. "
-        "Please consult with qualified professionals before making investment decisions.",
-        ParagraphStyle('Disclaimer', parent=footer_style, fontSize=7, textColor=HexColor('#888888'))
-    ))
+    story.append(Paragraph(DISCLAIMER_TEXT, DISCLAIMER_STYLE))
 
     # Build PDF
     doc.build(story)
@@ -478,8 +713,8 @@ def generate_pdf(data):
     return buffer
 
 
-def send_email(data, pdf_buffer):
-    """Send the PDF report via email."""
+def send_email(data, pdf_bytes):
+    """Queue the PDF report for delivery via email."""
     user_email = data.get('userEmail')
     user_name = data.get('userName')
     property_address = data.get('propertyAddress', 'Investment Property')
@@ -491,7 +726,7 @@ def send_email(data, pdf_buffer):
         return True
 
     # Create message
-    msg = MIMEMultipart()
+    msg = MIMEMultipart(policy=policy.SMTP)
     msg['From'] = EMAIL_FROM
     msg['To'] = user_email
     msg['Subject'] = f'Your Investment Property Analysis - {property_address}'
@@ -524,31 +759,101 @@ www.bogenhomes.com
 From Palm Beach to Miami, we can help you find your next investment property.
     """
 
-    msg.attach(MIMEText(body, 'plain'))
+    msg.attach(MIMEText(body, 'plain', policy=policy.SMTP))
 
     # Attach PDF
-    pdf_attachment = MIMEApplication(pdf_buffer.read(), _subtype='pdf')
-    safe_address = property_address.replace(' ', '_').replace(',', '')[:30]
+    pdf_attachment = MIMEApplication(pdf_bytes, _subtype='pdf', policy=policy.SMTP)
     pdf_attachment.add_header(
         'Content-Disposition',
         'attachment',
-        filename=f'Investment_Analysis_{safe_address}.pdf'
+        filename=_safe_filename(property_address)
     )
     msg.attach(pdf_attachment)
 
-    # Send email
-    try:
+    # Hand off to the background sender
+    _email_queue.put(msg)
+    start_email_worker()
+    print(f"Email queued for {user_email}")
+    return True
+
+
+class _SMTPPool:
+    """A long-lived SMTP connection reused across emails.
+
+    Connects and logs in on first use, then keeps the session open so later
+    sends skip the STARTTLS handshake and AUTH round-trips. A connection
+    idle for longer than idle_check seconds is probed with NOOP before use,
+    and a dropped connection is reopened.
+    """
+
+    def __init__(self, idle_check=60):
+        self._server = None
+        self._last_used = 0
+        self._idle_check = idle_check
+        self._lock = threading.Lock()
+
+    def _connect(self):
         server = smtplib.SMTP(EMAIL_HOST, EMAIL_PORT)
         server.starttls()
         server.login(EMAIL_USER, EMAIL_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        print(f"Email sent successfully to {user_email}")
-        return True
-    except Exception as e:
-        print(f"Error sending email: {str(e)}")
-        raise
-
-
+        return server
+
+    def _get_server(self):
+        if self._server is not None and time.monotonic() - self._last_used > self._idle_check:
+            try:
+                if self._server.noop()[0] != 250:
+                    self._server = None
+            except (smtplib.SMTPException, OSError):
+                self._server = None
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def send_message(self, msg):
+        """Send a message, reconnecting once if the server dropped us."""
+        with self._lock:
+            try:
+                self._get_server().send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._server = self._connect()
+                self._server.send_message(msg)
+            self._last_used = time.monotonic()
+
+    def close(self):
+        """Quit the current session, if any."""
+        with self._lock:
+            if self._server is not None:
+                try:
+                    self._server.quit()
+                except (smtplib.SMTPException, OSError):
+                    pass
+                self._server = None
+
+
+_smtp_pool = _SMTPPool()
+atexit.register(_smtp_pool.close)
+
+
+def start_email_worker():
+    """Start the background email sender if it is not already running."""
+    global _email_worker
+    with _email_worker_lock:
+        if _email_worker is None or not _email_worker.is_alive():
+            _email_worker = threading.Thread(target=email_worker, name='email-worker', daemon=True)
+            _email_worker.start()
+
+
+def email_worker():
+    """Send queued emails over the shared SMTP connection."""
+    while True:
+        msg = _email_queue.get()
+        try:
+            _smtp_pool.send_message(msg)
+            print(f"Email sent successfully to {msg['To']}")
+        except Exception as e:
+            print(f"Error sending email: {str(e)}")
+
+
+# Development server only - production runs under gunicorn (see run.sh)
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    app.run(debug=os.environ.get('FLASK_DEBUG') == '1', port=5000)
@@ -24,7 +24,14 @@ if [ -f ".env" ]; then
     export $(cat .env | grep -v '^#' | xargs)
 fi
 
-# Run the Flask application
+# Run the Flask application under gunicorn - one worker per CPU core, with
+# the app preloaded so workers share the cached styles and fonts
+WORKERS=${WEB_CONCURRENCY:-$(nproc 2>/dev/null || sysctl -n hw.ncpu)}
+
+# Each gunicorn worker already runs on its own core, so give each one a
+# single PDF rendering process
+export PDF_WORKERS=${PDF_WORKERS:-1}
+
 echo ""
 echo "======================================"
 echo "  Investment Property Analyzer"
@@ -35,4 +42,4 @@ echo "Starting server at http://localhost:5000"
 echo "Press Ctrl+C to stop"
 echo ""
 
-python3 app.py
+exec gunicorn -w "$WORKERS" -k gthread --threads 4 -b 0.0.0.0:5000 --preload app:app